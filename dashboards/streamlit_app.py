@@ -5,16 +5,120 @@ import numpy as np
 import plotly.express as px
 
 
-# Load pre-aggregated analytics CSVs or compute from base CSVs
-fub = pd.read_csv("data/follow_up_boss.csv", parse_dates=["created_at", "last_activity", "last_stage_change", "next_task_due"])
-dotloop = pd.read_csv("data/dotloop.csv", parse_dates=["expected_close_date", "actual_close_date"])
-quickbooks = pd.read_csv("data/quickbooks.csv", parse_dates=["invoice_date", "paid_date"])
-ads = pd.read_csv("data/ads.csv")
-agents = pd.read_csv("data/agents.csv")
-mls = pd.read_csv("data/mls.csv", parse_dates=["list_date", "close_date"])
-
 st.set_page_config(page_title="Real Estate Performance Dashboard", layout="wide")
 
+
+# Load base CSVs once (multithreaded pyarrow parser) and reuse the parsed frames across reruns
+@st.cache_data
+def load_fub():
+    return pd.read_csv("data/follow_up_boss.csv", engine="pyarrow", parse_dates=["created_at", "last_activity", "last_stage_change", "next_task_due"],
+                       dtype={"stage": "category"})
+
+
+@st.cache_data
+def load_dotloop():
+    return pd.read_csv("data/dotloop.csv", engine="pyarrow", parse_dates=["expected_close_date", "actual_close_date"],
+                       dtype={"deal_status": "category"})
+
+
+@st.cache_data
+def load_quickbooks():
+    # Indexed by deal_id so deal joins hash the key once
+    return pd.read_csv("data/quickbooks.csv", engine="pyarrow", parse_dates=["invoice_date", "paid_date"]).set_index("deal_id", drop=False)
+
+
+@st.cache_data
+def load_ads():
+    return pd.read_csv("data/ads.csv", engine="pyarrow", dtype={"platform": "category", "utm_campaign": "category"})
+
+
+@st.cache_data
+def load_agents():
+    # Indexed by agent_id for name lookups
+    return pd.read_csv("data/agents.csv", engine="pyarrow", dtype={"full_name": "category"}).set_index("agent_id", drop=False)
+
+
+@st.cache_data
+def load_mls():
+    return pd.read_csv("data/mls.csv", engine="pyarrow", parse_dates=["list_date", "close_date"],
+                       dtype={"status": "category", "city": "category"})
+
+
+# Per-agent KPIs indexed by agent_id, computed once instead of per selectbox change
+@st.cache_data
+def agent_kpis(agents, fub, dotloop, quickbooks):
+    kpis = pd.DataFrame(index=agents.index)
+    kpis["leads"] = fub.groupby("agent_assigned").size().reindex(agents["full_name"], fill_value=0).to_numpy()
+    kpis["deals_closed"] = dotloop["deal_status"].eq("Closed").groupby(dotloop["listing_agent_id"]).sum()
+    kpis["deals_closed"] = kpis["deals_closed"].fillna(0).astype(int)
+    kpis["total_commission"] = quickbooks.groupby("agent_id")["net_commission"].sum()
+    kpis["total_commission"] = kpis["total_commission"].fillna(0)
+    # NaN for agents without listings, matching the old "no deals" case
+    close_time = (dotloop["actual_close_date"] - dotloop["expected_close_date"]).dt.days
+    kpis["avg_close_delay"] = close_time.groupby(dotloop["listing_agent_id"]).mean()
+    return kpis
+
+
+# Selectbox options, in file order
+@st.cache_data
+def agent_names(agents):
+    return agents["full_name"].drop_duplicates().tolist()
+
+
+# full_name -> agent_id lookup for the selected agent
+@st.cache_data
+def name_to_id(agents):
+    return dict(zip(agents["full_name"], agents["agent_id"]))
+
+
+# Simulated 0–1 lead scores, drawn once per table size
+@st.cache_data
+def lead_scores(n):
+    return np.random.default_rng(0).random(n)
+
+
+# Simulated campaign outcomes, computed once per ads table
+@st.cache_data
+def build_campaign_stats(ads):
+    merged = ads.copy()
+    merged["closed_deals"] = merged["leads_generated"] // 4  # simulate closure rate
+    merged["cost_per_closed_deal"] = merged["ad_spend"] / merged["closed_deals"]
+    merged = merged[merged["closed_deals"] > 0]
+
+    # Simulate revenue per closed deal
+    merged["net_commission"] = merged["closed_deals"] * 5000  # assume $5k per deal
+    merged["roi"] = (merged["net_commission"] - merged["ad_spend"]) / merged["ad_spend"]
+
+    # Compute leads-to-close ratio
+    merged["leads_to_close_ratio"] = merged["closed_deals"] / merged["leads_generated"]
+    return merged
+
+
+# Closed-deal commission per agent; only the small summary is kept per rerun
+@st.cache_data
+def agent_leaderboard(closed_deals, quickbooks, agents):
+    # Join dotloop + quickbooks
+    leaderboard = closed_deals.join(quickbooks, on="loop_id", how="inner")
+
+    # Add agent names
+    leaderboard = leaderboard.join(agents["full_name"], on="agent_id")
+
+    # Create leaderboard summary (top 15; the chart orders bars itself)
+    return leaderboard.groupby("full_name", observed=True, sort=False)["net_commission"].sum().reset_index().nlargest(
+        15, "net_commission")
+
+
+fub = load_fub()
+dotloop = load_dotloop()
+quickbooks = load_quickbooks()
+ads = load_ads()
+agents = load_agents()
+mls = load_mls()
+
+# Closed slices shared across tabs
+closed_deals = dotloop.loc[dotloop["deal_status"].eq("Closed")]
+closed_listings = mls.loc[mls["status"].eq("Closed")]
+
 # Title
 st.title("🏠 Real Estate Analytics Dashboard")
 
@@ -25,21 +129,12 @@ with tabs[0]:
     st.header("📍 Business Overview")
 
     st.subheader("Commission Forecast (Under Contract)")
-    under_contract_ids = dotloop[dotloop["deal_status"] == "Under Contract"]["loop_id"]
-    forecast = quickbooks[quickbooks["deal_id"].isin(under_contract_ids)]
+    under_contract = dotloop.loc[dotloop["deal_status"].eq("Under Contract"), ["loop_id"]]
+    forecast = under_contract.join(quickbooks, on="loop_id", how="inner")
     st.metric("💰 Expected Commission", f"${forecast['net_commission'].sum():,.0f}")
 
     st.subheader("Agent Leaderboard (Closed Deals)")
-    # Merge dotloop + quickbooks
-    closed_deals = dotloop[dotloop["deal_status"] == "Closed"]
-    leaderboard = closed_deals.merge(quickbooks, left_on="loop_id", right_on="deal_id")
-
-    # Add agent names
-    leaderboard = leaderboard.merge(agents, on="agent_id", how="left")
-
-    # Create leaderboard summary
-    agent_summary = leaderboard.groupby("full_name")["net_commission"].sum().reset_index().sort_values(
-        by="net_commission", ascending=False)
+    agent_summary = agent_leaderboard(closed_deals, quickbooks, agents)
     st.altair_chart(
         alt.Chart(agent_summary).mark_bar().encode(
             x=alt.X("net_commission:Q", title="Total Commission"),
@@ -50,8 +145,7 @@ with tabs[0]:
     )
 
     st.subheader("Pipeline Stage Breakdown")
-    stage_counts = fub["stage"].value_counts().reset_index()
-    stage_counts.columns = ["stage", "count"]
+    stage_counts = fub.groupby("stage", observed=True, sort=False).size().reset_index(name="count")
     chart = alt.Chart(stage_counts).mark_bar().encode(
         x=alt.X("stage:N", sort="-y"),
         y="count:Q",
@@ -63,34 +157,24 @@ with tabs[0]:
 # ---------- AGENT PERFORMANCE ----------
 with tabs[1]:
     st.header("🏆 Agent Performance Tracker")
-    selected_agent = st.selectbox("Select an Agent", agents["full_name"].unique())
-    agent_id = agents[agents["full_name"] == selected_agent]["agent_id"].values[0]
+    selected_agent = st.selectbox("Select an Agent", agent_names(agents))
+    agent_id = name_to_id(agents)[selected_agent]
 
-    leads = fub[fub["agent_assigned"] == selected_agent]
-    deals = dotloop[dotloop["listing_agent_id"] == agent_id]
-    commissions = quickbooks[quickbooks["agent_id"] == agent_id]
+    row = agent_kpis(agents, fub, dotloop, quickbooks).loc[agent_id]
 
-    st.metric("Leads", len(leads))
-    st.metric("Deals Closed", len(deals[deals["deal_status"] == "Closed"]))
-    st.metric("Total Commission", f"${commissions['net_commission'].sum():,.0f}")
+    st.metric("Leads", int(row["leads"]))
+    st.metric("Deals Closed", int(row["deals_closed"]))
+    st.metric("Total Commission", f"${row['total_commission']:,.0f}")
 
-    if not deals.empty:
-        deals["close_time"] = (pd.to_datetime(deals["actual_close_date"]) - pd.to_datetime(deals["expected_close_date"])).dt.days
-        st.metric("Avg Close Delay", f"{deals['close_time'].mean():.1f} days")
+    if pd.notna(row["avg_close_delay"]):
+        st.metric("Avg Close Delay", f"{row['avg_close_delay']:.1f} days")
 
 # ---------- MARKETING ROI ----------
 with tabs[2]:
     st.header("📣 Campaign Performance")
 
     st.subheader("Cost per Closed Deal")
-    merged = ads.copy()
-    merged["closed_deals"] = merged["leads_generated"] // 4  # simulate closure rate
-    merged["cost_per_closed_deal"] = merged["ad_spend"] / merged["closed_deals"]
-    merged = merged[merged["closed_deals"] > 0]
-
-    # Simulate revenue per closed deal
-    merged["net_commission"] = merged["closed_deals"] * 5000  # assume $5k per deal
-    merged["roi"] = (merged["net_commission"] - merged["ad_spend"]) / merged["ad_spend"]
+    merged = build_campaign_stats(ads)
 
 
     # 📈 Bubble Chart: ROI vs CPCD
@@ -107,16 +191,17 @@ with tabs[2]:
             "roi": "ROI",
             "platform": "Ad Platform"
         },
-        title="Campaign ROI by Platform"
+        title="Campaign ROI by Platform",
+        render_mode="webgl"
     )
     fig.update_layout(height=500)
     st.plotly_chart(fig, use_container_width=True)
 
 
 
-    # 📊 Bar chart: CPCD
+    # 📊 Bar chart: CPCD (only the encoded columns are serialized to the browser)
     st.altair_chart(
-        alt.Chart(merged).mark_bar().encode(
+        alt.Chart(merged[["utm_campaign", "cost_per_closed_deal", "platform"]]).mark_bar().encode(
             x=alt.X("utm_campaign:N", title="Campaign"),
             y=alt.Y("cost_per_closed_deal:Q", title="Cost per Closed Deal"),
             color="platform:N"
@@ -124,9 +209,6 @@ with tabs[2]:
         use_container_width=True
     )
 
-    # Compute leads-to-close ratio
-    merged["leads_to_close_ratio"] = merged["closed_deals"] / merged["leads_generated"]
-
     st.subheader("📈 Leads-to-Close Ratio vs ROI")
 
     fig_ratio_roi = px.scatter(
@@ -141,7 +223,8 @@ with tabs[2]:
             "roi": "Return on Investment",
         },
         title="Campaign Efficiency: Leads-to-Close vs ROI",
-        color_discrete_sequence=px.colors.sequential.Turbo
+        color_discrete_sequence=px.colors.sequential.Turbo,
+        render_mode="webgl"
     )
 
     fig_ratio_roi.update_layout(height=500)
@@ -156,11 +239,14 @@ with tabs[2]:
 with tabs[3]:
     st.header("🌍 Territory Insights")
 
-    # city revenue bar chart
-    by_city = mls[mls["status"] == "Closed"].groupby("city").agg(
+    # Closed-listing summary per city, shared by the charts and the heatmap
+    city_summary = closed_listings.groupby("city", observed=True, sort=False).agg(
         listings=("mls_id", "count"),
         avg_sale_price=("sale_price", "mean")
-    ).reset_index().sort_values(by="listings", ascending=False)
+    ).reset_index()
+
+    # city revenue bar chart (top 20 cities by closed listings)
+    by_city = city_summary.nlargest(20, "listings")
 
     st.subheader("Most Expensive Cities by Closed Listings")
     st.altair_chart(
@@ -202,13 +288,8 @@ with tabs[3]:
         "Smithtown": {"lat": 40.855, "lon": -73.200}
     }
 
-    by_city = mls[mls["status"] == "Closed"].groupby("city").agg(
-        listings=("mls_id", "count"),
-        avg_sale_price=("sale_price", "mean")
-    ).reset_index().sort_values(by="listings", ascending=False)
-
-    by_city["lat"] = by_city["city"].map(lambda x: city_coords.get(x, {}).get("lat", np.nan))
-    by_city["lon"] = by_city["city"].map(lambda x: city_coords.get(x, {}).get("lon", np.nan))
+    coords_df = pd.DataFrame.from_dict(city_coords, orient="index").rename_axis("city").reset_index()
+    by_city = city_summary.merge(coords_df, on="city", how="left")
 
     st.subheader("📍 Territory Heatmap (Long Island)")
     fig_map = px.scatter_mapbox(
@@ -229,8 +310,8 @@ with tabs[3]:
 # ---------- LEAD SCORING ----------
 with tabs[4]:
     st.header("🎯 Lead Scoring Model (Simulated)")
-    fub["lead_score"] = pd.Series(np.random.rand(len(fub)))  # simulate 0–1 scores
-    top_leads = fub.sort_values("lead_score", ascending=False).head(10)
+    fub["lead_score"] = lead_scores(len(fub))
+    top_leads = fub.nlargest(10, "lead_score")
 
     st.write("Top 10 Most Promising Leads")
     st.dataframe(top_leads[["full_name", "email", "lead_source", "stage", "lead_score"]])